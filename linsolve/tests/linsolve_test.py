@@ -3,6 +3,11 @@ import unittest
 import linsolve
 import numpy as np
 import ast
+import copy
+try:
+    from types import MappingProxyType
+except(ImportError): # python 2
+    MappingProxyType = dict
 
 class TestLinSolve(unittest.TestCase):
     def test_ast_getterms(self):
@@ -43,18 +48,20 @@ class TestLinSolve(unittest.TestCase):
         self.assertRaises(AssertionError, linsolve.verify_weights, {'a':1.0+1.0j}, ['a'])
         self.assertRaises(AssertionError, linsolve.verify_weights, {'a':1.0}, ['a', 'b'])
     def test_infer_dtype(self):
-        self.assertEqual(linsolve.infer_dtype([1.,2.]), np.float32)
-        self.assertEqual(linsolve.infer_dtype([3,4]), np.float32)
-        self.assertEqual(linsolve.infer_dtype([np.float32(1),4]), np.float32)
-        self.assertEqual(linsolve.infer_dtype([np.float64(1),4]), np.float64)
-        self.assertEqual(linsolve.infer_dtype([np.float32(1),4j]), np.complex64)
-        self.assertEqual(linsolve.infer_dtype([np.float64(1),4j]), np.complex128)
-        self.assertEqual(linsolve.infer_dtype([np.complex64(1),4j]), np.complex64)
-        self.assertEqual(linsolve.infer_dtype([np.complex64(1),4.]), np.complex64)
-        self.assertEqual(linsolve.infer_dtype([np.complex128(1),np.float64(4.)]), np.complex128)
-        self.assertEqual(linsolve.infer_dtype([np.complex64(1),np.float64(4.)]), np.complex128)
-        self.assertEqual(linsolve.infer_dtype([np.complex64(1),np.int32(4.)]), np.complex128)
-        self.assertEqual(linsolve.infer_dtype([np.complex64(1),np.int64(4.)]), np.complex128)
+        cases = [([1.,2.], np.float32),
+                 ([3,4], np.float32),
+                 ([np.float32(1),4], np.float32),
+                 ([np.float64(1),4], np.float64),
+                 ([np.float32(1),4j], np.complex64),
+                 ([np.float64(1),4j], np.complex128),
+                 ([np.complex64(1),4j], np.complex64),
+                 ([np.complex64(1),4.], np.complex64),
+                 ([np.complex128(1),np.float64(4.)], np.complex128),
+                 ([np.complex64(1),np.float64(4.)], np.complex128),
+                 ([np.complex64(1),np.int32(4.)], np.complex128),
+                 ([np.complex64(1),np.int64(4.)], np.complex128)]
+        for values, dtype in cases:
+            self.assertEqual(linsolve.infer_dtype(values), dtype, msg=str(values))
     
 class TestLinearEquation(unittest.TestCase):
     def test_basics(self):
@@ -113,22 +120,25 @@ class TestLinearEquation(unittest.TestCase):
         np.testing.assert_equal(ans, le.eval(sol))
         
 
+# read-only data for x,y = 1,2 shared by the dense and sparse fixtures
+_BASIC_DATA = MappingProxyType({'x+y': 3, 'x-y': -1})
+_BASIC_WGTS = MappingProxyType({k: 1. for k in _BASIC_DATA})
+_SOLVE_MODES = ('default','lsqr','pinv','solve')
+
 class TestLinearSolver(unittest.TestCase):
-    def setUp(self):
-        self.sparse = False
-        eqs = ['x+y','x-y']
-        x,y = 1,2
-        d,w = {}, {}
-        for eq in eqs: d[eq],w[eq] = eval(eq), 1.
-        self.ls = linsolve.LinearSolver(d,w,sparse=self.sparse)
+    sparse = False
+    @classmethod
+    def setUpClass(cls):
+        cls.ls = linsolve.LinearSolver(_BASIC_DATA,_BASIC_WGTS,sparse=cls.sparse)
     def test_basics(self):
         self.assertEqual(len(self.ls.prms),2)
         self.assertEqual(len(self.ls.eqs), 2)
         self.assertEqual(self.ls.eqs[0].terms, [['x'],['y']])
         self.assertEqual(self.ls.eqs[1].terms, [['x'],[-1,'y']])
     def test_get_A(self):
-        self.ls.prm_order = {'x':0,'y':1} # override random default ordering
-        A = self.ls.get_A()
+        ls = copy.copy(self.ls) # don't clobber the shared solver
+        ls.prm_order = {'x':0,'y':1} # override random default ordering
+        A = ls.get_A()
         self.assertEqual(A.shape, (2,2,1))
         #np.testing.assert_equal(A.todense(), np.array([[1.,1],[1.,-1]]))
         np.testing.assert_equal(A, np.array([[[1.], [1]],[[1.],[-1]]]))
@@ -146,13 +156,13 @@ class TestLinearSolver(unittest.TestCase):
         self.assertAlmostEqual(sol['x'], 1.)
         self.assertAlmostEqual(sol['y'], 2.)
     def test_solve_modes(self):
-        for mode in ['default','lsqr','pinv','solve']:
+        for mode in _SOLVE_MODES:
             sol = self.ls.solve(mode=mode)
-            self.assertAlmostEqual(sol['x'], 1.)
-            self.assertAlmostEqual(sol['y'], 2.)
+            self.assertAlmostEqual(sol['x'], 1., msg=mode)
+            self.assertAlmostEqual(sol['y'], 2., msg=mode)
     def test_solve_arrays(self):
-        x = np.arange(100,dtype=np.float); x.shape = (10,10)
-        y = np.arange(100,dtype=np.float); y.shape = (10,10)
+        x = np.arange(100, dtype=np.float64).reshape(10,10)
+        y = np.arange(100, dtype=np.float64).reshape(10,10)
         eqs = ['2*x+y','-x+3*y']
         d,w = {}, {}
         for eq in eqs: d[eq],w[eq] = eval(eq), 1.
@@ -161,16 +171,16 @@ class TestLinearSolver(unittest.TestCase):
         np.testing.assert_almost_equal(sol['x'], x)
         np.testing.assert_almost_equal(sol['y'], y)
     def test_solve_arrays_modes(self):
-        x = np.arange(100,dtype=np.float); x.shape = (10,10)
-        y = np.arange(100,dtype=np.float); y.shape = (10,10)
+        x = np.arange(100, dtype=np.float64).reshape(10,10)
+        y = np.arange(100, dtype=np.float64).reshape(10,10)
         eqs = ['2*x+y','-x+3*y']
         d,w = {}, {}
         for eq in eqs: d[eq],w[eq] = eval(eq), 1.
         ls = linsolve.LinearSolver(d,w, sparse=self.sparse)
-        for mode in ['default','lsqr','pinv','solve']:
+        for mode in _SOLVE_MODES:
             sol = ls.solve(mode=mode)
-            np.testing.assert_almost_equal(sol['x'], x)
-            np.testing.assert_almost_equal(sol['y'], y)
+            np.testing.assert_almost_equal(sol['x'], x, err_msg=mode)
+            np.testing.assert_almost_equal(sol['y'], y, err_msg=mode)
     def test_A_shape(self):
         consts = {'a':np.arange(10), 'b':np.zeros((1,10))}
         ls = linsolve.LinearSolver({'a*x+b*y':0.},{'a*x+b*y':1},**consts)
@@ -184,8 +194,8 @@ class TestLinearSolver(unittest.TestCase):
         for eq in eqs: d[eq],w[eq] = eval(eq), 1.
         ls = linsolve.LinearSolver(d,w,a=a,b=b, sparse=self.sparse)
         sol = ls.solve()
-        np.testing.assert_almost_equal(sol['x'], x*np.ones(3,dtype=np.float))
-        np.testing.assert_almost_equal(sol['y'], y*np.ones(3,dtype=np.float))
+        np.testing.assert_almost_equal(sol['x'], x*np.ones(3,dtype=np.float64))
+        np.testing.assert_almost_equal(sol['y'], y*np.ones(3,dtype=np.float64))
     def test_wgt_arrays(self):
         x,y = 1.,2.
         a,b = 3.,1.
@@ -194,8 +204,8 @@ class TestLinearSolver(unittest.TestCase):
         for eq in eqs: d[eq],w[eq] = eval(eq), np.ones(4)
         ls = linsolve.LinearSolver(d,w,a=a,b=b, sparse=self.sparse)
         sol = ls.solve()
-        np.testing.assert_almost_equal(sol['x'], x*np.ones(4,dtype=np.float))
-        np.testing.assert_almost_equal(sol['y'], y*np.ones(4,dtype=np.float))
+        np.testing.assert_almost_equal(sol['x'], x*np.ones(4,dtype=np.float64))
+        np.testing.assert_almost_equal(sol['y'], y*np.ones(4,dtype=np.float64))
     def test_wgt_const_arrays(self):
         x,y = 1.,2.
         a,b = 3.*np.ones(4),1.
@@ -204,8 +214,8 @@ class TestLinearSolver(unittest.TestCase):
         for eq in eqs: d[eq],w[eq] = eval(eq)*np.ones(4), np.ones(4)
         ls = linsolve.LinearSolver(d,w,a=a,b=b, sparse=self.sparse)
         sol = ls.solve()
-        np.testing.assert_almost_equal(sol['x'], x*np.ones(4,dtype=np.float))
-        np.testing.assert_almost_equal(sol['y'], y*np.ones(4,dtype=np.float))
+        np.testing.assert_almost_equal(sol['x'], x*np.ones(4,dtype=np.float64))
+        np.testing.assert_almost_equal(sol['y'], y*np.ones(4,dtype=np.float64))
     def test_nonunity_wgts(self):
         x,y = 1.,2.
         a,b = 3.*np.ones(4),1.
@@ -214,8 +224,8 @@ class TestLinearSolver(unittest.TestCase):
         for eq in eqs: d[eq],w[eq] = eval(eq)*np.ones(4), 2*np.ones(4)
         ls = linsolve.LinearSolver(d,w,a=a,b=b, sparse=self.sparse)
         sol = ls.solve()
-        np.testing.assert_almost_equal(sol['x'], x*np.ones(4,dtype=np.float))
-        np.testing.assert_almost_equal(sol['y'], y*np.ones(4,dtype=np.float))
+        np.testing.assert_almost_equal(sol['x'], x*np.ones(4,dtype=np.float64))
+        np.testing.assert_almost_equal(sol['y'], y*np.ones(4,dtype=np.float64))
     def test_eval(self):
         x,y = 1.,2.
         a,b = 3.*np.ones(4),1.
@@ -224,8 +234,8 @@ class TestLinearSolver(unittest.TestCase):
         for eq in eqs: d[eq],w[eq] = eval(eq)*np.ones(4), np.ones(4)
         ls = linsolve.LinearSolver(d,w,a=a,b=b, sparse=self.sparse)
         sol = ls.solve()
-        np.testing.assert_almost_equal(sol['x'], x*np.ones(4,dtype=np.float))
-        np.testing.assert_almost_equal(sol['y'], y*np.ones(4,dtype=np.float))
+        np.testing.assert_almost_equal(sol['x'], x*np.ones(4,dtype=np.float64))
+        np.testing.assert_almost_equal(sol['y'], y*np.ones(4,dtype=np.float64))
         result = ls.eval(sol)
         for eq in d:
             np.testing.assert_almost_equal(d[eq], result[eq])
@@ -253,47 +263,26 @@ class TestLinearSolver(unittest.TestCase):
         self.assertAlmostEqual(sol['x'], 5.0/3.0)
         self.assertAlmostEqual(ls.chisq(sol), 1.0/3.0)
     def test_dtypes(self):
-        ls = linsolve.LinearSolver({'x_': 1.0+1.0j}, sparse=self.sparse)
-        self.assertEqual(ls.dtype,np.float32)
-        self.assertEqual(type(ls.solve()['x']), np.complex64)
-
-        ls = linsolve.LinearSolver({'x': 1.0+1.0j}, sparse=self.sparse)
-        self.assertEqual(ls.dtype, np.complex64)
-        self.assertEqual(type(ls.solve()['x']), np.complex64)
-
-        ls = linsolve.LinearSolver({'x_': np.ones(1,dtype=np.complex64)[0]}, sparse=self.sparse)
-        self.assertEqual(ls.dtype,np.float32)
-        self.assertEqual(type(ls.solve()['x']), np.complex64)
-
-        ls = linsolve.LinearSolver({'x': np.ones(1,dtype=np.complex64)[0]}, sparse=self.sparse)
-        self.assertEqual(ls.dtype,np.complex64)
-        self.assertEqual(type(ls.solve()['x']), np.complex64)
-
-        ls = linsolve.LinearSolver({'c*x': 1.0}, c=1.0+1.0j, sparse=self.sparse)
-        self.assertEqual(ls.dtype,np.complex64)
-        self.assertEqual(type(ls.solve()['x']), np.complex64)
-
-        d = {'c*x': np.ones(1,dtype=np.float32)[0]}
-        wgts = {'c*x': np.ones(1,dtype=np.float64)[0]}
-        c = np.ones(1,dtype=np.float32)[0]
-        ls = linsolve.LinearSolver(d, wgts=wgts, c=c, sparse=self.sparse)
-        self.assertEqual(ls.dtype,np.float64)
-        self.assertEqual(type(ls.solve()['x']), np.float64)
+        c64, f32, f64 = np.ones(1,dtype=np.complex64)[0], np.ones(1,dtype=np.float32)[0], np.ones(1,dtype=np.float64)[0]
+        # (data, wgts, consts, dtype of A, dtype of solution)
+        cases = [({'x_': 1.0+1.0j}, {}, {}, np.float32, np.complex64),
+                 ({'x': 1.0+1.0j}, {}, {}, np.complex64, np.complex64),
+                 ({'x_': c64}, {}, {}, np.float32, np.complex64),
+                 ({'x': c64}, {}, {}, np.complex64, np.complex64),
+                 ({'c*x': 1.0}, {}, {'c':1.0+1.0j}, np.complex64, np.complex64),
+                 ({'c*x': f32}, {'c*x': f64}, {'c':f32}, np.float64, np.float64)]
+        for d, wgts, consts, dtype, sol_dtype in cases:
+            ls = linsolve.LinearSolver(d, wgts=wgts, sparse=self.sparse, **consts)
+            self.assertEqual(ls.dtype, dtype, msg=str(d))
+            self.assertEqual(type(ls.solve()['x']), sol_dtype, msg=str(d))
 
 class TestLinearSolverSparse(TestLinearSolver):
-    def setUp(self):
-        self.sparse = True
-        eqs = ['x+y','x-y']
-        x,y = 1,2
-        d,w = {}, {}
-        for eq in eqs: d[eq],w[eq] = eval(eq), 1.
-        self.ls = linsolve.LinearSolver(d,w,sparse=self.sparse)
+    sparse = True
 
 
 
 class TestLogProductSolver(unittest.TestCase):
-    def setUp(self):
-        self.sparse=False
+    sparse = False
     def test_init(self):
         x,y,z = np.exp(1.), np.exp(2.), np.exp(3.)
         keys = ['x*y*z', 'x*y', 'y*z']
@@ -302,9 +291,10 @@ class TestLogProductSolver(unittest.TestCase):
         ls = linsolve.LogProductSolver(d,w,sparse=self.sparse)
         for k in ls.ls_phs.data:
             np.testing.assert_equal(ls.ls_phs.data[k], 0)
-        x,y,z = 1.,2.,3.
+        env = {'x':1., 'y':2., 'z':3.}
+        ans = {k: eval(k, {}, env) for k in ls.ls_amp.data}
         for k in ls.ls_amp.data:
-            np.testing.assert_equal(eval(k), ls.ls_amp.data[k])
+            np.testing.assert_equal(ans[k], ls.ls_amp.data[k])
     def test_conj(self):
         x,y = 1+1j, 2+2j
         d,w = {}, {}
@@ -315,8 +305,10 @@ class TestLogProductSolver(unittest.TestCase):
         for k in d: w[k] = 1.
         ls = linsolve.LogProductSolver(d,w,sparse=self.sparse)
         self.assertEqual(len(ls.ls_amp.data), 4)
+        env = {'x':x, 'y':y}
+        ans = {k: eval(k, {}, env) for k in ls.ls_amp.data}
         for k in ls.ls_amp.data:
-            self.assertEqual(eval(k), 3+3j) # make sure they are all x+y
+            self.assertEqual(ans[k], 3+3j) # make sure they are all x+y
             self.assertTrue(k.replace('1','-1') in ls.ls_phs.data)
     def test_solve(self):
         x,y,z = np.exp(1.), np.exp(2.), np.exp(3.)
@@ -325,16 +317,18 @@ class TestLogProductSolver(unittest.TestCase):
         for k in keys: d[k],w[k] = eval(k), 1.
         ls = linsolve.LogProductSolver(d,w,sparse=self.sparse)
         sol = ls.solve()
+        ans = {'x':x, 'y':y, 'z':z}
         for k in sol:
-            self.assertAlmostEqual(sol[k], eval(k))
+            self.assertAlmostEqual(sol[k], ans[k])
     def test_conj_solve(self):
         x,y = np.exp(1.), np.exp(2.+1j)
         d,w = {'x*y_':x*y.conjugate(), 'x':x}, {}
         for k in d: w[k] = 1.
         ls = linsolve.LogProductSolver(d,w,sparse=self.sparse)
         sol = ls.solve()
+        ans = {'x':x, 'y':y}
         for k in sol:
-            self.assertAlmostEqual(sol[k], eval(k))
+            self.assertAlmostEqual(sol[k], ans[k])
     def test_no_abs_phs_solve(self):
         x,y,z = 1.+1j, 2.+2j, 3.+3j
         d,w = {'x*y_':x*y.conjugate(), 'x*z_':x*z.conjugate(), 'y*z_':y*z.conjugate()}, {}
@@ -363,68 +357,80 @@ class TestLogProductSolver(unittest.TestCase):
                 self.assertEqual(sol[k].dtype, dtype)
 
 class TestLogProductSolverSparse(TestLogProductSolver):
-    def setUp(self):
-        self.sparse=True
+    sparse = True
 
 
+_SUMS_OF_PRODUCTS = {} # (sol, data, sol0) at complex128, built on first use
+def _sums_of_products(dtype=np.complex128):
+    '''Return fresh copies of the true solution, data, and starting guess for the
+    sums-of-products tests, cast to dtype.  The expressions are only evaluated once.'''
+    if not _SUMS_OF_PRODUCTS:
+        x = np.arange(1,31).reshape(10,3)*(1.0+1.0j)
+        y = np.arange(1,31).reshape(10,3)*(2.0-3.0j)
+        z = np.arange(1,31).reshape(10,3)*(3.0-9.0j)
+        w = np.arange(1,31).reshape(10,3)*(4.0+2.0j)
+        expressions = ['x*y+z*w', '2*x_*y_+z*w-1.0j*z*w', '2*x*w', '1.0j*x + y*z', '-1*x*z+3*y*w*x+y', '2*w_', '2*x_ + 3*y - 4*z']
+        sol = {'x':x, 'y':y, 'z':z, 'w':w}
+        env = dict(sol, x_=x.conj(), y_=y.conj(), z_=z.conj(), w_=w.conj())
+        _SUMS_OF_PRODUCTS['sol'] = sol
+        _SUMS_OF_PRODUCTS['data'] = {ex: eval(ex, {}, env) for ex in expressions}
+        _SUMS_OF_PRODUCTS['sol0'] = {'x':1.1*x, 'y': .9*y, 'z': 1.1*z, 'w':1.2*w}
+    return tuple({k: v.astype(dtype) for k,v in _SUMS_OF_PRODUCTS[name].items()} for name in ('sol','data','sol0'))
+
 class TestLinProductSolver(unittest.TestCase):
-    def setUp(self):
-        self.sparse=False
+    sparse = False
     def test_init(self):
         x,y,z = 1.+1j, 2.+2j, 3.+3j
         d,w = {'x*y_':x*y.conjugate(), 'x*z_':x*z.conjugate(), 'y*z_':y*z.conjugate()}, {}
         for k in list(d.keys()): w[k] = 1.
-        sol0 = {}
-        for k in 'xyz': sol0[k] = eval(k)+.01
+        sol0 = {'x':x+.01, 'y':y+.01, 'z':z+.01}
         ls = linsolve.LinProductSolver(d,sol0,w,sparse=self.sparse)
-        x,y,z = 1.,1.,1.
-        x_,y_,z_ = 1.,1.,1.
-        dx = dy = dz = .001
-        dx_ = dy_ = dz_ = .001
+        env = dict.fromkeys(['x','y','z','x_','y_','z_'], 1.)
+        env.update(dict.fromkeys(['dx','dy','dz','dx_','dy_','dz_'], .001))
+        ans = {k: eval(k, {}, env) for k in ls.ls.keys}
         for k in ls.ls.keys:
-            self.assertAlmostEqual(eval(k), 0.002)
+            self.assertAlmostEqual(ans[k], 0.002)
         self.assertEqual(len(ls.ls.prms), 3)
     def test_real_solve(self):
         x,y,z = 1., 2., 3.
         keys = ['x*y', 'x*z', 'y*z']
         d,w = {}, {}
         for k in keys: d[k],w[k] = eval(k), 1.
-        sol0 = {}
-        for k in 'xyz': sol0[k] = eval(k)+.01
+        sol0 = {'x':x+.01, 'y':y+.01, 'z':z+.01}
         ls = linsolve.LinProductSolver(d,sol0,w,sparse=self.sparse)
         sol = ls.solve()
+        ans = {'x':x, 'y':y, 'z':z}
         for k in sol:
             #print sol0[k], sol[k]
-            self.assertAlmostEqual(sol[k], eval(k), 4)
+            self.assertAlmostEqual(sol[k], ans[k], 4)
     def test_single_term(self):
         x,y,z = 1., 2., 3.
         keys = ['x*y', 'x*z', '2*z']
         d,w = {}, {}
         for k in keys: d[k],w[k] = eval(k), 1.
-        sol0 = {}
-        for k in 'xyz': sol0[k] = eval(k)+.01
+        sol0 = {'x':x+.01, 'y':y+.01, 'z':z+.01}
         ls = linsolve.LinProductSolver(d,sol0,w,sparse=self.sparse)
         sol = ls.solve()
+        ans = {'x':x, 'y':y, 'z':z}
         for k in sol:
-            self.assertAlmostEqual(sol[k], eval(k), 4)
+            self.assertAlmostEqual(sol[k], ans[k], 4)
     def test_complex_solve(self):
         x,y,z = 1+1j, 2+2j, 3+2j
         keys = ['x*y', 'x*z', 'y*z']
         d,w = {}, {}
         for k in keys: d[k],w[k] = eval(k), 1.
-        sol0 = {}
-        for k in 'xyz': sol0[k] = eval(k)+.01
+        sol0 = {'x':x+.01, 'y':y+.01, 'z':z+.01}
         ls = linsolve.LinProductSolver(d,sol0,w,sparse=self.sparse)
         sol = ls.solve()
+        ans = {'x':x, 'y':y, 'z':z}
         for k in sol:
-            self.assertAlmostEqual(sol[k], eval(k), 4)
+            self.assertAlmostEqual(sol[k], ans[k], 4)
     def test_complex_conj_solve(self):
         x,y,z = 1.+1j, 2.+2j, 3.+3j
         #x,y,z = 1., 2., 3.
         d,w = {'x*y_':x*y.conjugate(), 'x*z_':x*z.conjugate(), 'y*z_':y*z.conjugate()}, {}
         for k in list(d.keys()): w[k] = 1.
-        sol0 = {}
-        for k in 'xyz': sol0[k] = eval(k) + .01
+        sol0 = {'x':x+.01, 'y':y+.01, 'z':z+.01}
         ls = linsolve.LinProductSolver(d,sol0,w,sparse=self.sparse)
         ls.prm_order = {'x':0,'y':1,'z':2}
         sol = ls.solve()
@@ -433,13 +439,12 @@ class TestLinProductSolver(unittest.TestCase):
         self.assertAlmostEqual(x*z.conjugate(), d['x*z_'], 3)
         self.assertAlmostEqual(y*z.conjugate(), d['y*z_'], 3)
     def test_complex_array_solve(self):
-        x = np.arange(30, dtype=np.complex); x.shape = (3,10)
-        y = np.arange(30, dtype=np.complex); y.shape = (3,10)
-        z = np.arange(30, dtype=np.complex); z.shape = (3,10)
+        x = np.arange(30, dtype=np.complex128).reshape(3,10)
+        y = np.arange(30, dtype=np.complex128).reshape(3,10)
+        z = np.arange(30, dtype=np.complex128).reshape(3,10)
         d,w = {'x*y':x*y, 'x*z':x*z, 'y*z':y*z}, {}
         for k in list(d.keys()): w[k] = np.ones(d[k].shape)
-        sol0 = {}
-        for k in 'xyz': sol0[k] = eval(k) + .01
+        sol0 = {'x':x+.01, 'y':y+.01, 'z':z+.01}
         ls = linsolve.LinProductSolver(d,sol0,w,sparse=self.sparse)
         ls.prm_order = {'x':0,'y':1,'z':2}
         sol = ls.solve()
@@ -447,13 +452,12 @@ class TestLinProductSolver(unittest.TestCase):
         np.testing.assert_almost_equal(sol['y'], y, 2)
         np.testing.assert_almost_equal(sol['z'], z, 2)
     def test_complex_array_NtimesNfreqs1_solve(self):
-        x = np.arange(1, dtype=np.complex); x.shape = (1,1)
-        y = np.arange(1, dtype=np.complex); y.shape = (1,1)
-        z = np.arange(1, dtype=np.complex); z.shape = (1,1)
+        x = np.arange(1, dtype=np.complex128).reshape(1,1)
+        y = np.arange(1, dtype=np.complex128).reshape(1,1)
+        z = np.arange(1, dtype=np.complex128).reshape(1,1)
         d,w = {'x*y':x*y, 'x*z':x*z, 'y*z':y*z}, {}
         for k in list(d.keys()): w[k] = np.ones(d[k].shape)
-        sol0 = {}
-        for k in 'xyz': sol0[k] = eval(k) + .01
+        sol0 = {'x':x+.01, 'y':y+.01, 'z':z+.01}
         ls = linsolve.LinProductSolver(d,sol0,w,sparse=self.sparse)
         ls.prm_order = {'x':0,'y':1,'z':2}
         sol = ls.solve()
@@ -461,35 +465,21 @@ class TestLinProductSolver(unittest.TestCase):
         np.testing.assert_almost_equal(sol['y'], y, 2)
         np.testing.assert_almost_equal(sol['z'], z, 2)
     def test_sums_of_products(self):
-        x = np.arange(1,31)*(1.0+1.0j); x.shape=(10,3) 
-        y = np.arange(1,31)*(2.0-3.0j); y.shape=(10,3)
-        z = np.arange(1,31)*(3.0-9.0j); z.shape=(10,3)
-        w = np.arange(1,31)*(4.0+2.0j); w.shape=(10,3)
-        x_,y_,z_,w_ = list(map(np.conjugate,(x,y,z,w)))
-        expressions = ['x*y+z*w', '2*x_*y_+z*w-1.0j*z*w', '2*x*w', '1.0j*x + y*z', '-1*x*z+3*y*w*x+y', '2*w_', '2*x_ + 3*y - 4*z']
-        data = {}
-        for ex in expressions: data[ex] = eval(ex)
-        currentSol = {'x':1.1*x, 'y': .9*y, 'z': 1.1*z, 'w':1.2*w}
+        sol, data, currentSol = _sums_of_products()
+        testSolve = linsolve.LinProductSolver(data, currentSol,sparse=self.sparse)
         for i in range(20):
-            testSolve = linsolve.LinProductSolver(data, currentSol,sparse=self.sparse)
             currentSol = testSolve.solve()
+            testSolve._update_solver(currentSol) # refresh sol0 and residuals only, as solve_iteratively does
         for var in 'wxyz': 
-            np.testing.assert_almost_equal(currentSol[var], eval(var), 4) 
+            np.testing.assert_almost_equal(currentSol[var], sol[var], 4) 
     def test_eval(self):
-        x = np.arange(1,31)*(1.0+1.0j); x.shape=(10,3) 
-        y = np.arange(1,31)*(2.0-3.0j); y.shape=(10,3)
-        z = np.arange(1,31)*(3.0-9.0j); z.shape=(10,3)
-        w = np.arange(1,31)*(4.0+2.0j); w.shape=(10,3)
-        x_,y_,z_,w_ = list(map(np.conjugate,(x,y,z,w)))
-        expressions = ['x*y+z*w', '2*x_*y_+z*w-1.0j*z*w', '2*x*w', '1.0j*x + y*z', '-1*x*z+3*y*w*x+y', '2*w_', '2*x_ + 3*y - 4*z']
-        data = {}
-        for ex in expressions: data[ex] = eval(ex)
-        currentSol = {'x':1.1*x, 'y': .9*y, 'z': 1.1*z, 'w':1.2*w}
+        sol, data, currentSol = _sums_of_products()
+        testSolve = linsolve.LinProductSolver(data, currentSol,sparse=self.sparse)
         for i in range(40):
-            testSolve = linsolve.LinProductSolver(data, currentSol,sparse=self.sparse)
             currentSol = testSolve.solve()
+            testSolve._update_solver(currentSol) # refresh sol0 and residuals only, as solve_iteratively does
         for var in 'wxyz': 
-            np.testing.assert_almost_equal(currentSol[var], eval(var), 4)
+            np.testing.assert_almost_equal(currentSol[var], sol[var], 4)
         result = testSolve.eval(currentSol)
         for eq in data:
             np.testing.assert_almost_equal(data[eq], result[eq], 4)
@@ -497,46 +487,29 @@ class TestLinProductSolver(unittest.TestCase):
         x = 1.
         d = {'x*y':1, '.5*x*y+.5*x*y':2, 'y':1}
         currentSol = {'x':2.3,'y':.9}
+        testSolve = linsolve.LinProductSolver(d, currentSol,sparse=self.sparse)
         for i in range(40):
-            testSolve = linsolve.LinProductSolver(d, currentSol,sparse=self.sparse)
             currentSol = testSolve.solve()
+            testSolve.build_solver(currentSol) # rebuilds the linear system from the new sol0 each pass
         chisq = testSolve.chisq(currentSol)
         np.testing.assert_almost_equal(chisq, .5)
     def test_solve_iteratively(self):
-        x = np.arange(1,31)*(1.0+1.0j); x.shape=(10,3) 
-        y = np.arange(1,31)*(2.0-3.0j); y.shape=(10,3)
-        z = np.arange(1,31)*(3.0-9.0j); z.shape=(10,3)
-        w = np.arange(1,31)*(4.0+2.0j); w.shape=(10,3)
-        x_,y_,z_,w_ = list(map(np.conjugate,(x,y,z,w)))
-        expressions = ['x*y+z*w', '2*x_*y_+z*w-1.0j*z*w', '2*x*w', '1.0j*x + y*z', '-1*x*z+3*y*w*x+y', '2*w_', '2*x_ + 3*y - 4*z']
-        data = {}
-        for ex in expressions: data[ex] = eval(ex)
-        currentSol = {'x':1.1*x, 'y': .9*y, 'z': 1.1*z, 'w':1.2*w}
+        sol, data, currentSol = _sums_of_products()
         testSolve = linsolve.LinProductSolver(data, currentSol,sparse=self.sparse)
         meta, new_sol = testSolve.solve_iteratively()
         for var in 'wxyz': 
-            np.testing.assert_almost_equal(new_sol[var], eval(var), 4)
+            np.testing.assert_almost_equal(new_sol[var], sol[var], 4)
     def test_solve_iteratively_dtype(self):
-        x = np.arange(1,31)*(1.0+1.0j); x.shape=(10,3) 
-        y = np.arange(1,31)*(2.0-3.0j); y.shape=(10,3)
-        z = np.arange(1,31)*(3.0-9.0j); z.shape=(10,3)
-        w = np.arange(1,31)*(4.0+2.0j); w.shape=(10,3)
-        x_,y_,z_,w_ = list(map(np.conjugate,(x,y,z,w)))
-        expressions = ['x*y+z*w', '2*x_*y_+z*w-1.0j*z*w', '2*x*w', '1.0j*x + y*z', '-1*x*z+3*y*w*x+y', '2*w_', '2*x_ + 3*y - 4*z']
-        data = {}
         for dtype in (np.complex128, np.complex64):
-            for ex in expressions: data[ex] = eval(ex).astype(dtype)
-            currentSol = {'x':1.1*x, 'y': .9*y, 'z': 1.1*z, 'w':1.2*w}
-            currentSol = {k:v.astype(dtype) for k,v in currentSol.items()}
+            sol, data, currentSol = _sums_of_products(dtype)
             testSolve = linsolve.LinProductSolver(data, currentSol,sparse=self.sparse)
             meta, new_sol = testSolve.solve_iteratively()
             for var in 'wxyz':
                 self.assertEqual(new_sol[var].dtype, dtype)
-                np.testing.assert_almost_equal(new_sol[var], eval(var), 4)
+                np.testing.assert_almost_equal(new_sol[var], sol[var], 4)
 
 class TestLinProductSolverSparse(TestLinProductSolver):
-    def setUp(self):
-        self.sparse=True
+    sparse = True
 
 
 